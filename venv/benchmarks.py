@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the game engine.
+
+Run from this directory, e.g. `python benchmarks.py entity_lookup`.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import tcod
+
+from actions import BumpAction, WaitAction
+from engine import Engine
+import entity_factories
+from game_map import GameMap
+from level_cache import LevelCache, generate_level_for_seed
+from procgen import generate_dungeon
+from savegame import load_game, save_game, take_snapshot
+from simulate import simulate
+import tile_types
+
+
+def open_map(engine: Engine, width: int, height: int) -> GameMap:
+    """Return a map that is all floor except for a one tile border of walls."""
+    dungeon = GameMap(engine, width, height, entities=[engine.player])
+    dungeon.tiles[1:-1, 1:-1] = tile_types.floor
+    engine.player.place(width // 2, height // 2, dungeon)
+    return dungeon
+
+
+def spawn_bots(dungeon: GameMap, count: int, rng: random.Random) -> None:
+    """Spawn up to `count` bots on free floor tiles."""
+    for _ in range(count):
+        x = rng.randint(1, dungeon.width - 2)
+        y = rng.randint(1, dungeon.height - 2)
+        if not any(dungeon.get_entities_at_location(x, y)):
+            entity_factories.custodial_bot.spawn(dungeon, x, y)
+
+
+def new_engine(
+    width: int, height: int, bots: int, seed: int = 0, shared_pathing: bool = True
+) -> Engine:
+    engine = Engine(
+        player=entity_factories.player.clone(), shared_pathing=shared_pathing
+    )
+    engine.game_map = open_map(engine, width, height)
+    spawn_bots(engine.game_map, bots, random.Random(seed))
+    return engine
+
+
+def bench_entity_lookup(args: argparse.Namespace) -> None:
+    """Time one random BumpAction per bot per turn as the bot count grows."""
+    rng = random.Random(args.seed)
+    print(f"{'bots':>8} {'ms/turn':>10} {'us/move':>10}")
+    for count in args.bots:
+        engine = new_engine(args.width, args.height, count, args.seed)
+        bots = list(set(engine.game_map.actors) - {engine.player})
+
+        start = time.perf_counter()
+        for _ in range(args.turns):
+            for bot in bots:
+                BumpAction(bot, rng.randint(-1, 1), rng.randint(-1, 1)).perform()
+        elapsed = time.perf_counter() - start
+
+        per_turn = elapsed / args.turns
+        per_move = per_turn / max(len(bots), 1)
+        print(f"{len(bots):>8} {per_turn * 1e3:>10.3f} {per_move * 1e6:>10.3f}")
+
+
+def bench_enemy_pathing(args: argparse.Namespace) -> None:
+    """Compare per-enemy pathfinding with the shared distance field."""
+    print(f"{'bots':>8} {'mode':>10} {'ms/turn':>10}")
+    for count in args.bots:
+        for shared_pathing in (False, True):
+            engine = new_engine(args.width, args.height, count, args.seed, shared_pathing)
+            engine.update_fov()
+
+            # Silence the combat messages printed by MeleeAction.
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for _ in range(args.turns):
+                    engine.handle_enemy_turns()
+                elapsed = time.perf_counter() - start
+
+            mode = "shared" if shared_pathing else "per-ai"
+            print(f"{count:>8} {mode:>10} {elapsed / args.turns * 1e3:>10.3f}")
+
+
+def bench_generate_dungeon(args: argparse.Namespace) -> None:
+    """Time generate_dungeon with the same settings as main()."""
+    timings = []
+    for level in range(args.levels):
+        engine = Engine(player=entity_factories.player.clone())
+
+        start = time.perf_counter()
+        generate_dungeon(
+            max_rooms=40,
+            room_min_size=7,
+            room_max_size=25,
+            map_width=args.width,
+            map_height=args.height,
+            max_enemies_per_room=3,
+            engine=engine,
+            rng=random.Random(args.seed + level),
+        )
+        timings.append(time.perf_counter() - start)
+
+    print(f"{args.width}x{args.height}: {sum(timings) / len(timings) * 1e3:.3f} ms/level")
+
+
+def bench_frame_time(args: argparse.Namespace) -> None:
+    """Compare full and incremental rendering on idle and movement frames."""
+    print(f"{'bots':>8} {'mode':>12} {'idle ms':>10} {'move ms':>10}")
+    for count in args.bots:
+        for incremental_render in (False, True):
+            engine = new_engine(args.width, args.height, count, args.seed)
+            engine.incremental_render = incremental_render
+            engine.update_fov()
+            console = tcod.Console(args.width, args.height, order="F")
+            engine.render(console)  # Fill the incremental cache.
+
+            start = time.perf_counter()
+            for _ in range(args.turns):
+                engine.render(console)
+            idle = (time.perf_counter() - start) / args.turns
+
+            rng = random.Random(args.seed)
+            move = 0.0
+            for _ in range(args.turns):
+                BumpAction(engine.player, rng.randint(-1, 1), rng.randint(-1, 1)).perform()
+                engine.update_fov()
+                start = time.perf_counter()
+                engine.render(console)
+                move += time.perf_counter() - start
+            move /= args.turns
+
+            mode = "incremental" if incremental_render else "full"
+            print(f"{count:>8} {mode:>12} {idle * 1e3:>10.3f} {move * 1e3:>10.3f}")
+
+
+def bench_fov(args: argparse.Namespace) -> None:
+    """Compare full map and windowed FOV on a mix of wait and move turns."""
+    for fov_radius in (0, args.fov_radius):
+        engine = new_engine(args.width, args.height, 0, args.seed)
+        engine.fov_radius = fov_radius
+        rng = random.Random(args.seed)
+
+        for _ in range(args.turns):
+            if rng.random() < 0.5:
+                WaitAction(engine.player).perform()
+            else:
+                BumpAction(engine.player, rng.randint(-1, 1), rng.randint(-1, 1)).perform()
+            engine.update_fov()
+
+        print(f"radius {fov_radius:>3}: {engine.fov_stats}")
+
+
+def bench_suite(args: argparse.Namespace) -> None:
+    """
+    Run headless games across map sizes and enemy densities.
+
+    Reports turns/sec, time per phase and peak traced memory. Results are written as JSON to --json, or stdout.
+    """
+    results = []
+    for size in args.sizes:
+        width, height = (int(n) for n in size.split("x"))
+        # Keep the room density of the default 100x65 map with 40 rooms.
+        max_rooms = max(1, round(40 * width * height / (100 * 65)))
+        for density in args.densities:
+            settings = dict(
+                seed=args.seed,
+                map_width=width,
+                map_height=height,
+                max_rooms=max_rooms,
+                max_enemies_per_room=density,
+            )
+            result = simulate(turns=args.turns, **settings)
+
+            # Tracing slows everything down, so measure memory in a separate run.
+            tracemalloc.start()
+            simulate(turns=min(args.turns, 50), **settings)
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results.append(result)
+            print(
+                f"{size:>9} density {density:>3}: {result['enemies']:>5} enemies, "
+                f"{result['turns_per_second']:>9.1f} turns/sec, "
+                f"{result['peak_memory_bytes'] / 2**20:>7.2f} MiB peak",
+                file=sys.stderr,
+            )
+
+    output = json.dumps({"benchmark": "suite", "results": results}, indent=2)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+def bench_pregenerate(args: argparse.Namespace) -> None:
+    """Levels/sec generated by a process pool for each worker count, and the cost of a cache load."""
+    settings = dict(
+        max_rooms=40,
+        room_min_size=7,
+        room_max_size=25,
+        map_width=args.width,
+        map_height=args.height,
+        max_enemies_per_room=3,
+    )
+    seeds = range(args.seed, args.seed + args.levels)
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            executor.submit(int).result()  # Start the pool before timing.
+            start = time.perf_counter()
+            list(executor.map(generate_level_for_seed, seeds, [settings] * len(seeds)))
+            elapsed = time.perf_counter() - start
+        print(f"{workers:>3} workers: {len(seeds) / elapsed:>9.1f} levels/sec")
+        workers *= 2
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = LevelCache(directory, settings)
+        for seed in seeds:
+            cache.generate(seed)
+        start = time.perf_counter()
+        for seed in seeds:
+            cache.load(seed)
+        elapsed = time.perf_counter() - start
+    print(f"cache load: {elapsed / len(seeds) * 1e3:.3f} ms/level")
+
+
+def best_time(function: Callable[[], object], repeat: int = 3) -> float:
+    """Return the fastest of `repeat` calls, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_savegame(args: argparse.Namespace) -> None:
+    """Compare save size and save/load time of savegame with pickling the whole Engine."""
+    print(f"{'bots':>8} {'format':>10} {'KiB':>10} {'save ms':>10} {'load ms':>10}")
+    for count in args.bots:
+        engine = new_engine(args.width, args.height, count, args.seed)
+        engine.update_fov()
+
+        data = pickle.dumps(engine, protocol=pickle.HIGHEST_PROTOCOL)
+        save = best_time(lambda: pickle.dumps(engine, protocol=pickle.HIGHEST_PROTOCOL))
+        load = best_time(lambda: pickle.loads(data))
+        print(f"{count:>8} {'pickle':>10} {len(data) / 1024:>10.1f} {save * 1e3:>10.3f} {load * 1e3:>10.3f}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "save")
+            snapshot = best_time(lambda: take_snapshot(engine))
+            save = best_time(lambda: save_game(engine, path))
+            load = best_time(lambda: load_game(path))
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+        print(f"{count:>8} {'savegame':>10} {size / 1024:>10.1f} {save * 1e3:>10.3f} {load * 1e3:>10.3f}")
+        print(f"{'':>8} {'':>10} autosave stall (snapshot only): {snapshot * 1e3:.3f} ms")
+
+
+def bench_actors(args: argparse.Namespace) -> None:
+    """Spawn cost, memory per actor and enemy-turn time with the EntityStore."""
+    for count in args.bots:
+        engine = new_engine(args.width, args.height, 0, args.seed)
+        dungeon = engine.game_map
+        cells = [
+            (x, y) for x in range(1, dungeon.width - 1) for y in range(1, dungeon.height - 1)
+            if (x, y) != (engine.player.x, engine.player.y)
+        ]
+        random.Random(args.seed).shuffle(cells)
+        cells = cells[:count]
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        for x, y in cells:
+            entity_factories.custodial_bot.spawn(dungeon, x, y)
+        spawn = (time.perf_counter() - start) / len(cells)
+        memory = (tracemalloc.get_traced_memory()[0] - before) / len(cells)
+        tracemalloc.stop()
+
+        # The spawn cost of the old deepcopy approach, for comparison.
+        start = time.perf_counter()
+        for _ in range(min(len(cells), 1000)):
+            copy.deepcopy(entity_factories.custodial_bot)
+        deepcopy = (time.perf_counter() - start) / min(len(cells), 1000)
+
+        engine.update_fov()
+        with contextlib.redirect_stdout(io.StringIO()):
+            enemy_turn = best_time(engine.handle_enemy_turns)
+
+        print(
+            f"{len(cells):>6} actors: spawn {spawn * 1e6:.2f} us (deepcopy {deepcopy * 1e6:.2f} us), "
+            f"{memory:.0f} bytes/actor, enemy turn {enemy_turn * 1e3:.1f} ms"
+        )
+
+
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], None]] = {
+    "entity_lookup": bench_entity_lookup,
+    "enemy_pathing": bench_enemy_pathing,
+    "generate_dungeon": bench_generate_dungeon,
+    "frame_time": bench_frame_time,
+    "fov": bench_fov,
+    "suite": bench_suite,
+    "pregenerate": bench_pregenerate,
+    "savegame": bench_savegame,
+    "actors": bench_actors,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--height", type=int, default=65)
+    parser.add_argument("--bots", type=int, nargs="+", default=[10, 100, 1000, 3000])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--levels", type=int, default=10)
+    parser.add_argument("--fov-radius", type=int, default=10)
+    parser.add_argument("--sizes", nargs="+", default=["100x65", "200x130"])
+    parser.add_argument("--densities", type=int, nargs="+", default=[3, 10, 30])
+    parser.add_argument("--json", help="Write suite results to this file.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple, TypeVar, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+import tcod
+
+from actions import Action, MeleeAction, MovementAction, WaitAction
+from components.base_component import BaseComponent
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+AI = TypeVar('AI', bound='BaseAI')
+
+
+class BaseAI(Action, BaseComponent):
+    entity: Actor
+
+    def perform(self) -> None:
+        raise NotImplementedError()
+
+    def copy_for(self: AI, entity: Actor) -> AI:
+        """Return a copy of this AI for an actor cloned from this AI's actor.
+
+        Subclasses that hold mutable state must override this to copy it.
+        """
+        ai = object.__new__(type(self))
+        # Set one by one rather than with __dict__.update, which gives the copy a dict of its own instead of the
+        # compact one shared by instances of the class.
+        for name, value in self.__dict__.items():
+            setattr(ai, name, value)
+        ai.entity = entity
+        return ai
+
+    def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
+        """Compute and return a path to the target position.
+
+        If there is no valid path then returns an empty list.
+        """
+        # Walkable costs with blocking entities added.
+        cost = self.entity.gamemap.get_path_cost()
+
+        # Create a graph from the cost array and pass that graph to a new pathfinder.
+        graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
+        pathfinder = tcod.path.Pathfinder(graph)
+
+        pathfinder.add_root((self.entity.x, self.entity.y))  # Start position.
+
+        # Compute the path to the destination and remove the starting point.
+        path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
+
+        # Convert from List[List[int]] to List[Tuple[int, int]].
+        return [(index[0], index[1]) for index in path]
+
+    def get_step_down(self, distance: np.ndarray) -> Optional[Tuple[int, int]]:
+        """Return the neighbouring tile with the lowest value in a distance field.
+
+        Used with `Engine.player_distance` so that every enemy shares one search
+        per turn and only looks at its 8 neighbours.  If no neighbour is closer
+        than this entity's own tile then returns None.
+        """
+        x, y = self.entity.x, self.entity.y
+        x1, y1 = max(0, x - 1), max(0, y - 1)
+        window = distance[x1 : x + 2, y1 : y + 2]
+        step_x, step_y = np.unravel_index(window.argmin(), window.shape)
+
+        if window[step_x, step_y] >= distance[x, y]:
+            return None
+        return x1 + int(step_x), y1 + int(step_y)
+
+
+class HostileEnemy(BaseAI):
+    def __init__(self, entity: Actor):
+        super().__init__(entity)
+        self.path: List[Tuple[int, int]]  = []
+        # Where the player was last seen while walking the shared distance field, so the chase can go on out of view.
+        self.last_seen: Optional[Tuple[int, int]] = None
+
+    def copy_for(self, entity: Actor) -> HostileEnemy:
+        ai = super().copy_for(entity)
+        ai.path = list(self.path)
+        return ai
+
+    def perform(self) -> None:
+        engine = self.engine
+        target = engine.player
+        # Read the positions once, each read goes through the EntityStore.
+        x, y = self.entity.x, self.entity.y
+        dx = target.x - x
+        dy = target.y - y
+        distance = max(abs(dx), abs(dy)) # Chebyshev distance.
+
+        if engine.game_map.visible[x, y]:
+            if distance <= 1:
+                return MeleeAction(self.entity, dx, dy).perform()
+
+            if engine.player_distance is not None:
+                self.path = []
+                self.last_seen = (target.x, target.y)
+                step = self.get_step_down(engine.player_distance)
+                if step is None:
+                    return WaitAction(self.entity).perform()
+                return MovementAction(self.entity, step[0] - x, step[1] - y).perform()
+
+            self.path = self.get_path_to(target.x, target.y)
+        elif self.last_seen is not None:
+            # The player just went out of view, walk to where they were last seen.
+            self.path = self.get_path_to(*self.last_seen)
+            self.last_seen = None
+
+        if self.path:
+            dest_x, dest_y, = self.path.pop(0)
+            return MovementAction(self.entity, dest_x - x, dest_y - y).perform()
+
+        return WaitAction(self.entity).perform()
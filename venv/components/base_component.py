@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from entity import Entity
+
+
+class BaseComponent:
+    __slots__ = ()
+
+    entity: Entity  # Owning entity instance.
+
+    @property
+    def engine(self) -> Engine:
+        return self.entity.gamemap.engine
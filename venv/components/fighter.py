@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple, TYPE_CHECKING
+
+from components.base_component import BaseComponent
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+class Fighter(BaseComponent):
+    """
+    Combat stats for an Actor.
+
+    The stats are stored in the actor's row of its EntityStore, so a Fighter only holds them itself until it is attached.
+    """
+    __slots__ = ("entity", "_initial_stats")
+
+    entity: Actor
+
+    def __init__(
+        self, structure: int, temperature: int, coruption: int, defense: int, power: int
+    ):
+        self._initial_stats: Optional[Tuple[int, int, int, int, int]] = (
+            structure, temperature, coruption, defense, power
+        )
+
+    def attach(self, entity: Actor) -> None:
+        """Make this the fighter of an actor and write its stats to the actor's row."""
+        self.entity = entity
+        if self._initial_stats is None:
+            return
+
+        structure, temperature, coruption, defense, power = self._initial_stats
+        self._initial_stats = None
+        self.max_struct = structure
+        self._struct = structure
+        self.max_temp = temperature
+        self._temp = temperature
+        self.max_coruption = coruption
+        self._coruption = coruption
+        self.defense = defense
+        self.power = power
+
+    def copy_for(self, entity: Actor) -> Fighter:
+        """Return a fighter for an actor cloned from this fighter's actor, which already has a copy of its row."""
+        return Fighter.for_row(entity)
+
+    @classmethod
+    def for_row(cls, entity: Actor) -> Fighter:
+        """Return a fighter for an actor whose row already holds its stats."""
+        fighter = cls.__new__(cls)
+        fighter._initial_stats = None
+        fighter.entity = entity
+        return fighter
+
+    @property
+    def max_struct(self) -> int:
+        return self.entity._store.max_structure.item(self.entity._row)
+
+    @max_struct.setter
+    def max_struct(self, value: int) -> None:
+        self.entity._store.max_structure[self.entity._row] = value
+
+    @property
+    def _struct(self) -> int:
+        return self.entity._store.structure.item(self.entity._row)
+
+    @_struct.setter
+    def _struct(self, value: int) -> None:
+        self.entity._store.structure[self.entity._row] = value
+
+    @property
+    def struct(self) -> int:
+        return self._struct
+
+    @struct.setter
+    def struct(self, value: int) -> None:
+        self._struct = max(0, min(value, self.max_struct))
+        if self._struct == 0 and self.entity.ai:
+            self.die()
+
+    @property
+    def max_temp(self) -> int:
+        return self.entity._store.max_temperature.item(self.entity._row)
+
+    @max_temp.setter
+    def max_temp(self, value: int) -> None:
+        self.entity._store.max_temperature[self.entity._row] = value
+
+    @property
+    def _temp(self) -> int:
+        return self.entity._store.temperature.item(self.entity._row)
+
+    @_temp.setter
+    def _temp(self, value: int) -> None:
+        self.entity._store.temperature[self.entity._row] = value
+
+    @property
+    def temp(self) -> int:
+        return self._temp
+
+    @temp.setter
+    def temp(self, value: int) -> None:
+        self._temp = max(0, min(value, self.max_temp))
+
+    @property
+    def max_coruption(self) -> int:
+        return self.entity._store.max_coruption.item(self.entity._row)
+
+    @max_coruption.setter
+    def max_coruption(self, value: int) -> None:
+        self.entity._store.max_coruption[self.entity._row] = value
+
+    @property
+    def _coruption(self) -> int:
+        return self.entity._store.coruption.item(self.entity._row)
+
+    @_coruption.setter
+    def _coruption(self, value: int) -> None:
+        self.entity._store.coruption[self.entity._row] = value
+
+    @property
+    def coruption(self) -> int:
+        return self._coruption
+
+    @coruption.setter
+    def coruption(self, value: int) -> None:
+        self._coruption = max(0, min(value, self.max_coruption))
+
+    @property
+    def defense(self) -> int:
+        return self.entity._store.defense.item(self.entity._row)
+
+    @defense.setter
+    def defense(self, value: int) -> None:
+        self.entity._store.defense[self.entity._row] = value
+
+    @property
+    def power(self) -> int:
+        return self.entity._store.power.item(self.entity._row)
+
+    @power.setter
+    def power(self, value: int) -> None:
+        self.entity._store.power[self.entity._row] = value
+
+    def die(self) -> None:
+        if self.engine.player is self.entity:
+            death_message = "You died!"
+        else:
+            death_message = f"{self.entity.name} is dead!"
+
+        self.entity.char = "%"
+        self.entity.color = (191, 0, 0)
+        self.entity.blocks_movement = False
+        self.entity.ai = None
+        self.entity.name = f"Remains of {self.entity.name}"
+
+        print(death_message)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+from tcod.context import Context
+from tcod.console import Console
+from tcod.map import compute_fov
+import tcod.path
+
+from input_handlers import EventHandler
+import tile_types
+
+if TYPE_CHECKING:
+    from entity import Entity
+    from game_map import GameMap
+    from savegame import Autosaver
+
+
+class FOVStats:
+    """Counts calls to Engine.update_fov and the time spent in them."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of calls that were answered from the cache."""
+        return self.hits / self.calls if self.calls else 0.0
+
+    @property
+    def seconds_per_turn(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"FOV: {self.calls} turns, {self.hit_rate:.0%} cache hits, "
+            f"{self.seconds_per_turn * 1e3:.3f} ms/turn"
+        )
+
+
+class Engine:
+    game_map: GameMap
+
+    def __init__(
+        self,
+        player: Entity,
+        shared_pathing: bool = True,
+        incremental_render: bool = True,
+        fov_radius: int = 0,
+    ):
+        self.event_handler: EventHandler = EventHandler(self)
+        self.player = player
+        # When True all enemies walk one shared distance field per turn instead of
+        # each running their own pathfinder.
+        self.shared_pathing = shared_pathing
+        self.player_distance: Optional[np.ndarray] = None
+        # When True the console is kept between frames and only changes are redrawn.
+        self.incremental_render = incremental_render
+        # If not 0 then FOV is only computed in a window this far around the player.
+        self.fov_radius = fov_radius
+        self.fov_stats = FOVStats()
+        # What the last FOV was computed from, and the window it was written to.
+        self._fov_key: Optional[Tuple[Any, ...]] = None
+        self._fov_window: Optional[Tuple[slice, slice]] = None
+        # Called after every turn if set.
+        self.autosaver: Optional[Autosaver] = None
+
+    def handle_enemy_turns(self) -> None:
+        if self.shared_pathing:
+            self.update_player_distance()
+        else:
+            self.player_distance = None
+
+        store = self.game_map.store
+        for row in store.rows(store.alive).tolist():
+            entity = store.entities[row]
+            # Check again in case an earlier enemy has killed this one this turn.
+            if entity is not self.player and entity.ai:
+                entity.ai.perform()
+
+    def update_player_distance(self) -> None:
+        """Recompute the distance from every tile to the player.
+
+        Uses the same costs as `BaseAI.get_path_to`, so enemies that walk down this
+        field take the same routes as they would with their own pathfinder.
+        """
+        cost = self.game_map.get_path_cost()
+        distance = np.full(cost.shape, np.iinfo(np.int32).max, dtype=np.int32, order="F")
+        distance[self.player.x, self.player.y] = 0
+        tcod.path.dijkstra2d(distance, cost, 2, 3)
+        self.player_distance = distance
+
+    def update_fov(self) -> None:
+        """Recompute the visible area based on the players point of view."""
+        start = time.perf_counter()
+        self.fov_stats.calls += 1
+
+        key = (self.game_map, self.game_map.tiles_version, self.player.x, self.player.y, self.fov_radius)
+        if key == self._fov_key:
+            # Nothing that FOV depends on has changed.
+            self.fov_stats.hits += 1
+            self.fov_stats.seconds += time.perf_counter() - start
+            return
+
+        if self._fov_key is None or self._fov_key[0] is not self.game_map:
+            self._fov_window = None
+        self._fov_key = key
+
+        if self.fov_radius:
+            self._update_fov_window()
+        else:
+            self.game_map.visible[:] = compute_fov(
+                self.game_map.transparent,
+                (self.player.x, self.player.y),
+                radius=0,
+            )
+            # If a tile is "visible" it should be added to "explored".
+            self.game_map.explored |= self.game_map.visible
+            self._fov_window = None
+
+        self.game_map.mark_fov_dirty()
+        self.fov_stats.seconds += time.perf_counter() - start
+
+    def _update_fov_window(self) -> None:
+        """Compute FOV only for the tiles within fov_radius of the player."""
+        game_map = self.game_map
+        radius = self.fov_radius
+        x1, y1 = max(0, self.player.x - radius), max(0, self.player.y - radius)
+        x2 = min(game_map.width, self.player.x + radius + 1)
+        y2 = min(game_map.height, self.player.y + radius + 1)
+        window = (slice(x1, x2), slice(y1, y2))
+
+        # Only the last window can have visible tiles in it.
+        if self._fov_window is None:
+            game_map.visible[:] = False
+        else:
+            game_map.visible[self._fov_window] = False
+
+        visible = compute_fov(
+            tile_types.palette["transparent"][game_map.tiles[window]],
+            (self.player.x - x1, self.player.y - y1),
+            radius=radius,
+        )
+        game_map.visible[window] = visible
+        # If a tile is "visible" it should be added to "explored".
+        game_map.explored[window] |= visible
+        self._fov_window = window
+
+    def render(self, console: Console, context: Optional[Context] = None) -> None:
+        if self.incremental_render:
+            self.game_map.render_incremental(console)
+        else:
+            self.game_map.render(console)
+
+        if context is not None:
+            context.present(console)
+
+        if not self.incremental_render:
+            console.clear()
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple, Type, TypeVar, TYPE_CHECKING
+
+from entity_store import EntityStore
+from render_order import RenderOrder
+
+if TYPE_CHECKING:
+    from components.ai import BaseAI
+    from components.fighter import Fighter
+    from game_map import GameMap
+
+T = TypeVar('T', bound='Entity')
+A = TypeVar('A', bound='Actor')
+
+
+class Entity:
+    """
+    A generic object to represent players, enemies, items, etc.
+
+    Position and blocking are stored in this entity's row of an EntityStore.
+    """
+    __slots__ = ("_store", "_row", "_char", "_color", "name", "_render_order", "gamemap")
+
+    gamemap: GameMap
+
+    def __init__(
+        self,
+        gamemap: Optional[GameMap] = None,
+        x: int = 0,
+        y: int = 0,
+        char: str = '?',
+        color: Tuple[int, int, int] = (255, 255, 255),
+        name: str = '<Unnamed>',
+        blocks_movement: bool = False,
+        render_order: RenderOrder = RenderOrder.CORPSE,
+    ):
+        self._store = EntityStore(capacity=1)
+        self._row = self._store.allocate(self)
+
+        self.x = x
+        self.y = y
+        self.char = char
+        self.color = color
+        self.name = name
+        self.blocks_movement = blocks_movement
+        self._render_order = render_order
+
+        if gamemap:
+            # If gamemap isn't provided now then it will be set later.
+            self.gamemap = gamemap
+            gamemap.add_entity(self)
+
+    @property
+    def x(self) -> int:
+        return self._store.x.item(self._row)
+
+    @x.setter
+    def x(self, value: int) -> None:
+        self._store.x[self._row] = value
+        self._update_location()
+
+    @property
+    def y(self) -> int:
+        return self._store.y.item(self._row)
+
+    @y.setter
+    def y(self, value: int) -> None:
+        self._store.y[self._row] = value
+        self._update_location()
+
+    def _set_position(self, x: int, y: int) -> None:
+        """Write x and y without updating the location index."""
+        self._store.x[self._row] = x
+        self._store.y[self._row] = y
+
+    def _update_location(self) -> None:
+        """Keep the map's location index in step with x and y if this entity is on a map."""
+        if hasattr(self, 'gamemap') and self in self.gamemap.entities:
+            self.gamemap.update_entity_location(self)
+
+    @property
+    def blocks_movement(self) -> bool:
+        return self._store.blocks.item(self._row)
+
+    @blocks_movement.setter
+    def blocks_movement(self, value: bool) -> None:
+        self._store.blocks[self._row] = value
+
+    @property
+    def char(self) -> str:
+        return self._char
+
+    @char.setter
+    def char(self, value: str) -> None:
+        self._char = value
+        if hasattr(self, 'gamemap'):
+            self.gamemap.mark_entity_dirty(self)
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        return self._color
+
+    @color.setter
+    def color(self, value: Tuple[int, int, int]) -> None:
+        self._color = value
+        if hasattr(self, 'gamemap'):
+            self.gamemap.mark_entity_dirty(self)
+
+    @property
+    def render_order(self) -> RenderOrder:
+        return self._render_order
+
+    @render_order.setter
+    def render_order(self, value: RenderOrder) -> None:
+        self._render_order = value
+        if hasattr(self, 'gamemap'):
+            self.gamemap.update_entity_render_order(self)
+
+    def clone(self: T, store: Optional[EntityStore] = None) -> T:
+        """Return a copy of this entity in a new row of `store`, or in a store of its own. It isn't on any map."""
+        if store is None:
+            store = EntityStore(capacity=1)
+
+        clone = object.__new__(type(self))
+        clone._store = store
+        clone._row = store.allocate(clone)
+        store.copy_row(self._store, self._row, clone._row)
+
+        clone._char = self._char
+        clone._color = self._color
+        clone.name = self.name
+        clone._render_order = self._render_order
+        return clone
+
+    def spawn(self: T, gamemap: GameMap, x: int, y: int) -> T:
+        """Spawn a copy of this instance at the given location."""
+        clone = self.clone(gamemap.store)
+        clone._set_position(x, y)
+        clone.gamemap = gamemap
+        gamemap.add_entity(clone)
+        return clone
+
+    def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
+        """Place this entity at a new location. Handles moving across GameMaps."""
+        if gamemap:
+            if hasattr(self, 'gamemap'): # Possibly uninitialized.
+                self.gamemap.remove_entity(self)
+            self._set_position(x, y)
+            self.gamemap = gamemap
+            gamemap.add_entity(self)
+        else:
+            self._set_position(x, y)
+            self.gamemap.update_entity_location(self)
+
+    def move(self, dx: int, dy: int) -> None:
+        # Move the entity by a given amount
+        self._set_position(self.x + dx, self.y + dy)
+        self.gamemap.update_entity_location(self)
+
+class Actor(Entity):
+    __slots__ = ("_ai", "fighter")
+
+    def __init__(
+        self,
+        *,
+        x: int = 0,
+        y: int = 0,
+        char: str = "?",
+        color: Tuple[int, int, int] = (255, 255, 255),
+        name: str = "<Unnamed>",
+        ai_cls: Type[BaseAI],
+        fighter: Fighter
+    ):
+        super().__init__(
+            x=x,
+            y=y,
+            char=char,
+            color=color,
+            name=name,
+            blocks_movement=True,
+            render_order=RenderOrder.ACTOR,
+        )
+        self._store.is_actor[self._row] = True
+
+        self.ai = ai_cls(self)
+
+        self.fighter = fighter
+        self.fighter.attach(self)
+
+    @property
+    def ai(self) -> Optional[BaseAI]:
+        return self._ai
+
+    @ai.setter
+    def ai(self, value: Optional[BaseAI]) -> None:
+        self._ai = value
+        self._store.alive[self._row] = value is not None
+
+    def clone(self: A, store: Optional[EntityStore] = None) -> A:
+        clone = super().clone(store)
+        clone._ai = self._ai.copy_for(clone) if self._ai else None
+        clone.fighter = self.fighter.copy_for(clone)
+        return clone
+
+    @property
+    def is_alive(self) -> bool:
+        """Returns True as long as this actor can perform actions"""
+        return self._store.alive.item(self._row)
\ No newline at end of file
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+
+class EntityStore:
+    """
+    Struct-of-arrays storage for entities.
+
+    Each entity owns one row, and the attributes kept here are NumPy columns so that queries over every entity on a map,
+    such as finding the living actors, can be vectorized. Entity and Fighter read and write their rows through
+    properties. Every GameMap has a store, and an entity that isn't on a map has a store of its own.
+
+    The columns are views of two 2D arrays, one for flags and one for numbers, so a whole row can be copied or cleared
+    with two assignments.
+    """
+    FLAG_COLUMNS = (
+        "in_use",  # False for rows that are free.
+        "blocks",
+        "is_actor",
+        "alive",  # True for actors that have an AI.
+    )
+    NUMBER_COLUMNS = (
+        "x",
+        "y",
+        "structure",
+        "max_structure",
+        "temperature",
+        "max_temperature",
+        "coruption",
+        "max_coruption",
+        "defense",
+        "power",
+    )
+    COLUMNS: Dict[str, type] = {
+        **{name: np.bool_ for name in FLAG_COLUMNS},
+        **{name: np.int32 for name in NUMBER_COLUMNS},
+    }
+
+    in_use: np.ndarray
+    blocks: np.ndarray
+    is_actor: np.ndarray
+    alive: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    structure: np.ndarray
+    max_structure: np.ndarray
+    temperature: np.ndarray
+    max_temperature: np.ndarray
+    coruption: np.ndarray
+    max_coruption: np.ndarray
+    defense: np.ndarray
+    power: np.ndarray
+
+    def __init__(self, capacity: int = 64):
+        self.flags = np.zeros((len(self.FLAG_COLUMNS), capacity), dtype=np.bool_)
+        self.numbers = np.zeros((len(self.NUMBER_COLUMNS), capacity), dtype=np.int32)
+        self._bind_columns()
+
+        # The entity that owns each row.
+        self.entities: List[Optional[Entity]] = [None] * capacity
+        self.size = 0  # Rows at or past this have never been used.
+        self._free_rows: List[int] = []
+
+    @property
+    def capacity(self) -> int:
+        return len(self.entities)
+
+    def allocate(self, entity: Entity) -> int:
+        """Return an empty row for a new entity."""
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(max(1, self.capacity * 2))
+            row = self.size
+            self.size += 1
+
+        self.in_use[row] = True
+        self.entities[row] = entity
+        return row
+
+    def allocate_many(self, entities: List[Entity]) -> slice:
+        """Return a slice of empty rows for new entities, one each and in order, after every row used so far."""
+        start, end = self.size, self.size + len(entities)
+        if end > self.capacity:
+            self._grow(max(end, self.capacity * 2))
+        self.size = end
+
+        self.in_use[start:end] = True
+        self.entities[start:end] = entities
+        return slice(start, end)
+
+    def free(self, row: int) -> None:
+        """Clear a row so it can be reused."""
+        self.flags[:, row] = False
+        self.numbers[:, row] = 0
+        self.entities[row] = None
+        self._free_rows.append(row)
+
+    def copy_row(self, source: EntityStore, source_row: int, row: int) -> None:
+        """Copy every column of a row in another store into a row of this store."""
+        self.flags[:, row] = source.flags[:, source_row]
+        self.numbers[:, row] = source.numbers[:, source_row]
+
+    def move_in(self, entity: Entity) -> None:
+        """Move an entity's row from the store it is in to this store."""
+        old_store, old_row = entity._store, entity._row
+        row = self.allocate(entity)
+        self.copy_row(old_store, old_row, row)
+        old_store.free(old_row)
+        entity._store, entity._row = self, row
+
+    def rows(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the rows in use, or only those where a column mask such as `alive` is also True."""
+        in_use = self.in_use[: self.size]
+        if mask is not None:
+            in_use = in_use & mask[: self.size]
+        return np.flatnonzero(in_use)
+
+    def _grow(self, capacity: int) -> None:
+        flags = np.zeros((len(self.FLAG_COLUMNS), capacity), dtype=np.bool_)
+        flags[:, : self.capacity] = self.flags
+        numbers = np.zeros((len(self.NUMBER_COLUMNS), capacity), dtype=np.int32)
+        numbers[:, : self.capacity] = self.numbers
+        self.flags, self.numbers = flags, numbers
+        self._bind_columns()
+        self.entities.extend([None] * (capacity - self.capacity))
+
+    def _bind_columns(self) -> None:
+        for i, name in enumerate(self.FLAG_COLUMNS):
+            setattr(self, name, self.flags[i])
+        for i, name in enumerate(self.NUMBER_COLUMNS):
+            setattr(self, name, self.numbers[i])
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+from tcod.console import Console
+
+from entity import Actor
+from entity_store import EntityStore
+from render_order import RenderOrder
+import tile_types
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from entity import Entity
+
+
+class GameMap:
+    def __init__(
+        self, engine: Engine, width: int, height: int, entities: Iterable[Entity] = ()
+    ):
+        self.engine = engine
+        self.width, self.height = width, height
+        self.entities: Set[Entity] = set()
+        # Column storage for the entities on this map.
+        self.store = EntityStore()
+
+        # Spatial index of entities, keyed by the cell they are standing on.
+        self._entity_locations: Dict[Tuple[int, int], Set[Entity]] = {}
+        self._indexed_locations: Dict[Entity, Tuple[int, int]] = {}
+
+        # Entities grouped by render order, so they don't need sorting every frame.
+        self._render_buckets: Dict[RenderOrder, Set[Entity]] = {order: set() for order in RenderOrder}
+        # Cells where the entities to draw may have changed since the last frame.
+        self._dirty_cells: Set[Tuple[int, int]] = set()
+
+        for entity in entities:
+            self.add_entity(entity)
+
+        # Tile IDs, see tile_types.palette for the data of each tile.
+        self.tiles = np.full(
+            (width, height), fill_value=tile_types.horizontal_wall, dtype=np.uint8, order="F"
+        )
+
+        self.visible = np.full(
+            (width, height), fill_value=False, order="F"
+        )  # Tiles the player can currently see
+
+        self.explored = np.full(
+            (width, height), fill_value=False, order="F"
+        )  # Tiles the player has seen before
+
+        # Incremented by mark_tiles_changed, so caches built from the tiles can tell they are stale.
+        self.tiles_version = 0
+
+        self._walkable_cost: Optional[np.ndarray] = None
+
+        # State kept between calls to render_incremental.
+        self._render_console: Optional[Console] = None
+        self._map_layer: Optional[np.ndarray] = None  # Tile graphics as currently drawn, without entities.
+        self._rendered_visible = self.visible.copy()
+        self._rendered_explored = self.explored.copy()
+        self._fov_dirty = True
+
+    @property
+    def walkable(self) -> np.ndarray:
+        """Boolean array of the tiles that can be walked over."""
+        return tile_types.palette["walkable"][self.tiles]
+
+    @property
+    def transparent(self) -> np.ndarray:
+        """Boolean array of the tiles that don't block FOV."""
+        return tile_types.palette["transparent"][self.tiles]
+
+    @property
+    def dark(self) -> np.ndarray:
+        """Graphics for each tile when it is not in FOV."""
+        return tile_types.palette["dark"][self.tiles]
+
+    @property
+    def light(self) -> np.ndarray:
+        """Graphics for each tile when it is in FOV."""
+        return tile_types.palette["light"][self.tiles]
+
+    def get_tile(self, x: int, y: int) -> np.ndarray:
+        """Return the tile_dt data for a single tile."""
+        return tile_types.palette[self.tiles[x, y]]
+
+    @property
+    def entities_in_render_order(self) -> Iterator[Entity]:
+        """Iterate over this maps entities, lowest render order first."""
+        for order in RenderOrder:
+            yield from self._render_buckets[order]
+
+    @property
+    def actors(self) -> Iterator[Actor]:
+        """Iterate over this maps living actors"""
+        entities = self.store.entities
+        for row in self.store.rows(self.store.alive).tolist():
+            yield entities[row]  # type: ignore
+
+    def add_entity(self, entity: Entity) -> None:
+        """Add an entity to this map, or re-index it if it is already here."""
+        if entity._store is not self.store:
+            self.store.move_in(entity)
+        self.entities.add(entity)
+        self.update_entity_location(entity)
+        self.update_entity_render_order(entity)
+
+    def add_entities(self, entities: List[Entity]) -> None:
+        """
+        Add many entities to this map, with one pass over them for each index instead of calling add_entity for each.
+
+        The entities must already have rows in this map's store.
+        """
+        self.entities.update(entities)
+
+        rows = [entity._row for entity in entities]
+        locations = list(zip(self.store.x[rows].tolist(), self.store.y[rows].tolist()))
+        for entity, location in zip(entities, locations):
+            self._entity_locations.setdefault(location, set()).add(entity)
+        self._indexed_locations.update(zip(entities, locations))
+        self._dirty_cells.update(locations)
+
+        for entity in entities:
+            self._render_buckets[entity.render_order].add(entity)
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Remove an entity from this map and from the location index."""
+        self.entities.remove(entity)
+        self._unindex_entity(entity)
+        self._render_buckets[entity.render_order].discard(entity)
+        # Give the entity a store of its own while it isn't on a map.
+        EntityStore(capacity=1).move_in(entity)
+
+    def update_entity_location(self, entity: Entity) -> None:
+        """Move an entity to its current x and y in the location index.
+
+        Called by Entity whenever an entity on this map changes position.
+        """
+        self._unindex_entity(entity)
+        location = (entity.x, entity.y)
+        self._entity_locations.setdefault(location, set()).add(entity)
+        self._indexed_locations[entity] = location
+        self._dirty_cells.add(location)
+
+    def update_entity_render_order(self, entity: Entity) -> None:
+        """Move an entity to the render bucket for its current render order. Does nothing if it isn't on this map."""
+        if entity not in self.entities:
+            return
+
+        for bucket in self._render_buckets.values():
+            bucket.discard(entity)
+        self._render_buckets[entity.render_order].add(entity)
+        self.mark_entity_dirty(entity)
+
+    def mark_entity_dirty(self, entity: Entity) -> None:
+        """Tell render_incremental that an entity on this map changed how it looks."""
+        location = self._indexed_locations.get(entity)
+        if location is not None:
+            self._dirty_cells.add(location)
+
+    def _unindex_entity(self, entity: Entity) -> None:
+        location = self._indexed_locations.pop(entity, None)
+        if location is None:
+            return
+
+        occupants = self._entity_locations[location]
+        occupants.discard(entity)
+        if not occupants:
+            del self._entity_locations[location]
+        self._dirty_cells.add(location)
+
+    def get_entities_at_location(self, x: int, y: int) -> Iterator[Entity]:
+        """Iterate over every entity standing on the given tile."""
+        yield from self._entity_locations.get((x, y), ())
+
+    def get_blocking_entity_at_location(
+        self, location_x: int, location_y: int
+    ) -> Optional[Entity]:
+
+        for entity in self.get_entities_at_location(location_x, location_y):
+            if entity.blocks_movement:
+                return entity
+
+        return None
+
+    def get_path_cost(self) -> np.ndarray:
+        """
+        Return a new movement cost array for pathfinding.
+
+        Walls have a cost of 0 (impassable) and floors a cost of 1. Tiles holding a blocking entity cost 10 more, so
+        enemies route around each other. The tile part is built once and cached, so only the entities are patched in on
+        each call. Call `mark_tiles_changed` after changing `tiles`.
+        """
+        if self._walkable_cost is None:
+            self._walkable_cost = np.array(self.walkable, dtype=np.int8, order="F")
+
+        cost = self._walkable_cost.copy(order="F")
+
+        rows = self.store.rows(self.store.blocks)
+        xs, ys = self.store.x[rows], self.store.y[rows]
+        # Only add to positions that aren't walls (a cost of zero.)
+        not_wall = cost[xs, ys] != 0
+        # Add to the cost of a blocked position.
+        # A lower number means more enemies will crowd behind each other in
+        # hallways.  A higher number means enemies will take longer paths in
+        # order to surround the player.
+        np.add.at(cost, (xs[not_wall], ys[not_wall]), 10)
+
+        return cost
+
+    def mark_tiles_changed(self) -> None:
+        """Invalidate everything cached from `tiles`. Must be called after changing tiles once the game has started."""
+        self.tiles_version += 1
+        self._walkable_cost = None
+        self._map_layer = None
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """Return True if x and y are inside of the bounds of this map."""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def render(self, console: Console) -> None:
+        """
+        Renders the map.
+
+        If a tile is in the "visible" array, then draw it with the "light" colors.
+        If it isn't, but it's in the "explored" array, then draw it with the "dark" colors.
+        Otherwise, the default is "SHROUD".
+        """
+        console.tiles_rgb[0 : self.width, 0 : self.height] = self._tile_graphics(...)
+
+        for entity in self.entities_in_render_order:
+            # Only print entities that are in the FOV.
+            if self.visible[entity.x, entity.y]:
+                console.print(
+                    x=entity.x, y=entity.y, string=entity.char, fg=entity.color
+                )
+
+    def render_incremental(self, console: Console) -> None:
+        """
+        Renders the map like `render`, but only redraws what changed since the last call.
+
+        The console must not be cleared or drawn over between calls. Tiles are only redrawn after `mark_fov_dirty` and
+        only where "visible" or "explored" changed. Entities are only redrawn in cells where one moved, was added or
+        removed, or changed its looks, and in cells whose tile was redrawn.
+        """
+        tiles_rgb = console.tiles_rgb
+
+        if self._map_layer is None or console is not self._render_console:
+            self._map_layer = self._tile_graphics(...)
+            self._rendered_visible[:] = self.visible
+            self._rendered_explored[:] = self.explored
+            tiles_rgb[0 : self.width, 0 : self.height] = self._map_layer
+            self._render_console = console
+            self._dirty_cells = set(self._entity_locations)
+        elif self._fov_dirty:
+            changed_mask = (self.visible != self._rendered_visible) | (self.explored != self._rendered_explored)
+            changed = np.nonzero(changed_mask)
+            self._map_layer[changed] = self._tile_graphics(changed)
+            self._rendered_visible[changed] = self.visible[changed]
+            self._rendered_explored[changed] = self.explored[changed]
+            tiles_rgb[changed] = self._map_layer[changed]
+
+            # Entities standing on redrawn tiles were drawn over.
+            rows = self.store.rows()
+            xs, ys = self.store.x[rows], self.store.y[rows]
+            under = changed_mask[xs, ys]
+            self._dirty_cells.update(zip(xs[under].tolist(), ys[under].tolist()))
+
+        self._fov_dirty = False
+
+        if not self._dirty_cells:
+            return
+
+        # Draw the map back over the dirty cells, then the top entity in each one that is in the FOV.
+        dirty = tuple(np.array(list(self._dirty_cells)).T)
+        tiles_rgb[dirty] = self._map_layer[dirty]
+
+        for x, y in self._dirty_cells:
+            occupants = self._entity_locations.get((x, y))
+            if occupants and self.visible[x, y]:
+                entity = max(occupants, key=lambda occupant: occupant.render_order.value)
+                console.print(x=x, y=y, string=entity.char, fg=entity.color)
+
+        self._dirty_cells.clear()
+
+    def mark_fov_dirty(self) -> None:
+        """Tell render_incremental that "visible" or "explored" may have changed."""
+        self._fov_dirty = True
+
+    def _tile_graphics(self, index: Any) -> np.ndarray:
+        """
+        Returns the graphics to draw for the tiles at `index`.
+
+        If a tile is in the "visible" array, then use its "light" graphics, if only in "explored" its "dark" graphics,
+        otherwise SHROUD.
+        """
+        tiles = self.tiles[index]
+        return np.select(
+            condlist=[self.visible[index], self.explored[index]],
+            choicelist=[tile_types.palette["light"][tiles], tile_types.palette["dark"][tiles]],
+            default=tile_types.SHROUD,
+        )
+
+    def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
+        for entity in self.get_entities_at_location(x, y):
+            if isinstance(entity, Actor) and entity.is_alive:
+                return entity
+
+        return None
\ No newline at end of file
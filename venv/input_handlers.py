@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+import tcod.event
+
+from actions import Action, BumpAction, EscapeAction, WaitAction
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+
+MOVE_KEYS = {
+    # Arrow keys.
+    tcod.event.K_UP: (0, -1),
+    tcod.event.K_DOWN: (0, 1),
+    tcod.event.K_LEFT: (-1, 0),
+    tcod.event.K_RIGHT: (1, 0),
+    tcod.event.K_HOME: (-1, -1),
+    tcod.event.K_END: (-1, 1),
+    tcod.event.K_PAGEUP: (1, -1),
+    tcod.event.K_PAGEDOWN: (1, 1),
+    # Numpad keys.
+    tcod.event.K_KP_1: (-1, 1),
+    tcod.event.K_KP_2: (0, 1),
+    tcod.event.K_KP_3: (1, 1),
+    tcod.event.K_KP_4: (-1, 0),
+    tcod.event.K_KP_6: (1, 0),
+    tcod.event.K_KP_7: (-1, -1),
+    tcod.event.K_KP_8: (0, -1),
+    tcod.event.K_KP_9: (1, -1),
+    # Vi keys.
+    tcod.event.K_h: (-1, 0),
+    tcod.event.K_j: (0, 1),
+    tcod.event.K_k: (0, -1),
+    tcod.event.K_l: (1, 0),
+    tcod.event.K_y: (-1, -1),
+    tcod.event.K_u: (1, -1),
+    tcod.event.K_b: (-1, 1),
+    tcod.event.K_n: (1, 1),
+}
+
+SHIFT_KEYS = {
+    # Move diagonally with shift and arrow keys. 
+    tcod.event.K_UP: (-1, -1),
+    tcod.event.K_LEFT: (-1, 1),
+    tcod.event.K_RIGHT: (1, -1),
+    tcod.event.K_DOWN: (1, 1),
+}
+
+WAIT_KEYS = {
+    tcod.event.K_PERIOD,
+    tcod.event.K_KP_5,
+    tcod.event.K_SPACE,
+}
+
+
+class EventHandler(tcod.event.EventDispatch[Action]):
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def handle_events(self) -> None:
+        for event in tcod.event.wait():
+            action = self.dispatch(event)
+
+            if action is None:
+                continue
+
+            action.perform()
+
+            self.engine.handle_enemy_turns()
+            self.engine.update_fov() # Update FOV before next player action
+
+            if self.engine.autosaver:
+                self.engine.autosaver.on_turn(self.engine)
+
+    def ev_quit(self, event: tcod.event.Quit) -> Optional[Action]:
+        raise SystemExit()
+
+    def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[Action]:
+        action: Optional[Action] = None
+
+        key = event.sym
+
+        player = self.engine.player
+
+        #Need to update tcod before this code can work
+        #state = tcod.event.get_keyboard_state()
+        #is_shift_held = state[tcod.event.KeySym.shift.scancode]
+
+        #if is_shift_held and key in SHIFT_KEYS:
+            #dx, dy =MOVE_KEYS[key]
+            #action = BumpAction(player, dx, dy)
+        if key in MOVE_KEYS:
+            dx, dy = MOVE_KEYS[key]
+            action = BumpAction(player, dx, dy)
+        elif key in WAIT_KEYS:
+            action = WaitAction(player)
+
+        elif key == tcod.event.K_ESCAPE:
+            action = EscapeAction(player)
+
+        # No valid key was pressed
+        return action
\ No newline at end of file
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import random
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from procgen import DungeonLevel, generate_level
+
+# Bump this when procgen changes what it generates for a seed, so old cached levels are not used.
+LEVEL_FORMAT_VERSION = 1
+
+
+def generate_level_for_seed(seed: int, settings: Dict[str, int]) -> DungeonLevel:
+    """Generate the level for a seed. `settings` are the keyword arguments of procgen.generate_level except rng."""
+    return generate_level(rng=random.Random(seed), **settings)
+
+
+class LevelCache:
+    """
+    Generated levels stored on disk, one pickle file per seed.
+
+    Levels made with different settings are kept apart, since the same seed gives a different level.
+    """
+    def __init__(self, directory: str, settings: Dict[str, int]):
+        self.directory = directory
+        self.settings = dict(settings)
+
+        key = json.dumps([LEVEL_FORMAT_VERSION, self.settings], sort_keys=True)
+        self._settings_hash = hashlib.sha1(key.encode()).hexdigest()[:12]
+
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, seed: int) -> str:
+        return os.path.join(self.directory, f"level-{self._settings_hash}-{seed}.pickle")
+
+    def seeds(self) -> List[int]:
+        """Return the seeds that have a cached level, in ascending order."""
+        prefix, suffix = f"level-{self._settings_hash}-", ".pickle"
+        return sorted(
+            int(name[len(prefix) : -len(suffix)])
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(suffix)
+        )
+
+    def discard(self, seed: int) -> None:
+        """Remove the cached level for a seed, if there is one."""
+        try:
+            os.remove(self.path(seed))
+        except FileNotFoundError:
+            pass
+
+    def load(self, seed: int) -> Optional[DungeonLevel]:
+        """Return the cached level for this seed, or None if it hasn't been generated."""
+        try:
+            with open(self.path(seed), "rb") as f:
+                level: DungeonLevel = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        return level
+
+    def save(self, seed: int, level: DungeonLevel) -> None:
+        """Write a level to the cache. Readers never see a partly written file."""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(level, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path(seed))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def generate(self, seed: int) -> DungeonLevel:
+        """Generate the level for a seed and save it."""
+        level = generate_level_for_seed(seed, self.settings)
+        self.save(seed, level)
+        return level
+
+
+class LevelPregenerator:
+    """
+    Generates levels in a pool of worker processes ahead of when they are needed.
+
+    Workers write each level to the LevelCache as they finish, so `get` is only a cache load for a level that was
+    prefetched in time.
+    """
+    def __init__(self, cache: LevelCache, max_workers: Optional[int] = None):
+        self.cache = cache
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._pending: Dict[int, Future[DungeonLevel]] = {}
+
+    def prefetch(self, seeds: Iterable[int]) -> None:
+        """Start generating the levels for these seeds in the background, unless they are cached already."""
+        for seed in seeds:
+            if seed in self._pending or os.path.exists(self.cache.path(seed)):
+                continue
+            self._pending[seed] = self.executor.submit(self.cache.generate, seed)
+
+    def get(self, seed: int) -> DungeonLevel:
+        """Return the level for a seed, waiting for it or generating it here if it isn't ready."""
+        future = self._pending.pop(seed, None)
+        if future is not None:
+            return future.result()
+
+        level = self.cache.load(seed)
+        if level is None:
+            level = self.cache.generate(seed)
+        return level
+
+    def finish(self) -> None:
+        """
+        Stop taking new work, and let the workers exit once the levels already prefetched are done, without waiting for
+        them. Afterwards `get` generates levels in this process.
+        """
+        self._pending.clear()
+        self.executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """Stop the workers, dropping any levels that haven't started generating."""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self.executor.shutdown()
+
+    def __enter__(self) -> LevelPregenerator:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import random
+from typing import List, Optional
+
+import tcod
+
+from engine import Engine
+import entity_factories
+from level_cache import LevelCache, LevelPregenerator
+from procgen import build_dungeon
+from savegame import Autosaver, load_game
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Wisest Wizard')
+    parser.add_argument(
+        '--continue', dest='resume', action='store_true', help='Continue from the last autosave.'
+    )
+    args = parser.parse_args(argv)
+
+    screen_width = 100
+    screen_height = 75
+
+    map_width = 100
+    map_height = 65
+
+    room_max_size = 25
+    room_min_size = 7
+    max_rooms = 40
+
+    max_enemies_per_room  = 3
+
+    # How many levels to keep generated ahead of the one being played.
+    prefetch_levels = 3
+
+    save_directory = 'savegame'
+    autosave_every_n_turns = 50
+
+    if args.resume and not os.path.exists(save_directory):
+        parser.error(f'There is no saved game in {save_directory!r}.')
+
+    scifi_tileset = tcod.tileset.load_tilesheet(
+        'Yayo_tunur_1040x325.png', 16, 16, tcod.tileset.CHARMAP_CP437
+    )
+
+    level_cache = LevelCache(
+        'level_cache',
+        settings=dict(
+            max_rooms=max_rooms,
+            room_min_size=room_min_size,
+            room_max_size=room_max_size,
+            map_width=map_width,
+            map_height=map_height,
+            max_enemies_per_room=max_enemies_per_room,
+        ),
+    )
+
+    # Levels use consecutive seeds. A game starts on the lowest seed left in the cache by the last game, so startup
+    # is only a cache load after the first run, and the levels after it are generated in the background.
+    cached_seeds = level_cache.seeds()
+    first_seed = cached_seeds[0] if cached_seeds else random.randrange(2 ** 32)
+
+    # The levels after the first aren't needed until the next game, so the workers are let go once they are done with
+    # them instead of being kept for the whole session.
+    pregenerator = LevelPregenerator(level_cache, max_workers=prefetch_levels)
+    try:
+        pregenerator.prefetch(range(first_seed + 1, first_seed + 1 + prefetch_levels))
+
+        if args.resume:
+            engine = load_game(save_directory)
+        else:
+            first_level = pregenerator.get(first_seed)
+            level_cache.discard(first_seed)  # So the next game doesn't start on it again.
+
+            player = entity_factories.player.clone()
+
+            engine = Engine(player=player)
+
+            engine.game_map = build_dungeon(first_level, engine)
+    finally:
+        pregenerator.finish()
+
+    engine.update_fov()
+
+    engine.autosaver = Autosaver(save_directory, every_n_turns=autosave_every_n_turns)
+    try:
+        play(engine, screen_width, screen_height, scifi_tileset)
+    finally:
+        # Wait for the last autosave to be written before exiting.
+        engine.autosaver.close()
+
+
+def play(engine: Engine, screen_width: int, screen_height: int, tileset: tcod.tileset.Tileset) -> None:
+    with tcod.context.new(
+        columns=screen_width,
+        rows=screen_height,
+        tileset=tileset,
+        title='Wisest Wizard',
+        vsync=True,
+    ) as context:
+
+        root_console = tcod.Console(screen_width, screen_height, order='F')
+
+        while True:
+            engine.render(console=root_console, context=context)
+
+            engine.event_handler.handle_events()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import tcod
+import numpy as np
+
+import entity_factories
+from game_map import GameMap
+import tile_types
+
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+
+class RectangularRoom:
+    def __init__(self, x: int, y: int, width: int, height: int):
+        self.x1 = x
+        self.y1 = y
+        self.x2 = x + width
+        self.y2 = y + height
+        self.width = width
+        self.height = height
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        center_x = int((self.x1 + self.x2) / 2)
+        center_y = int((self.y1 + self.y2) / 2)
+
+        return center_x, center_y
+
+    @property
+    def inner(self) -> Tuple[slice, slice]:
+        """Return the inner area of this room as a 2D array index."""
+        return slice(self.x1 + 1, self.x2), slice(self.y1 + 1, self.y2)
+
+    def intersects(self, other: RectangularRoom) -> bool:
+        """Return True if this room overlaps with another RectangularRoom."""
+        return (
+            self.x1 <= other.x2
+            and self.x2 >= other.x1
+            and self.y1 <= other.y2
+            and self.y2 >= other.y1
+        )
+
+class DungeonLevel:
+    """
+    A generated level before it is turned into a GameMap: its tiles, where the player starts and what spawns where. It
+    holds no Engine or entities, so it can be pickled, cached on disk and generated in another process.
+    """
+    def __init__(self, width: int, height: int):
+        self.width, self.height = width, height
+        self.tiles = np.full(
+            (width, height), fill_value=tile_types.horizontal_wall, dtype=np.uint8, order="F"
+        )
+        self.player_start: Tuple[int, int] = (0, 0)
+        # The name of an entity in entity_factories and where to spawn it, in spawn order. Use add_spawn to add to it.
+        self.spawns: List[Tuple[str, int, int]] = []
+        # The cells in spawns, so is_occupied doesn't need to scan it. Not pickled, it is rebuilt from spawns.
+        self._spawn_cells: Set[Tuple[int, int]] = set()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_spawn_cells"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._spawn_cells = {(x, y) for _, x, y in self.spawns}
+
+    def add_spawn(self, name: str, x: int, y: int) -> None:
+        """Spawn the entity_factories entity called `name` at x and y when this level is built."""
+        self.spawns.append((name, x, y))
+        self._spawn_cells.add((x, y))
+
+    def is_occupied(self, x: int, y: int) -> bool:
+        """Return True if the player starts or something spawns at x and y."""
+        return (x, y) == self.player_start or (x, y) in self._spawn_cells
+
+def place_entities(
+        room: RectangularRoom, dungeon: DungeonLevel, maximum_enemies: int, rng: random.Random,
+) -> None:
+    number_of_enemies = rng.randint(0, maximum_enemies)
+
+    for i in range(number_of_enemies):
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
+
+        if not dungeon.is_occupied(x, y) and dungeon.tiles[x, y] == tile_types.floor:
+            if rng.random() < 0.8:
+                dungeon.add_spawn("custodial_bot", x, y)
+            else:
+                dungeon.add_spawn("security_bot", x, y)
+
+def tunnel_between(
+    start: Tuple[int, int], end: Tuple[int, int], rng: random.Random
+) -> Iterator[Tuple[int, int]]:
+    """Return an L-shaped tunnel between these two points."""
+    x1, y1 = start
+    x2, y2 = end
+    if rng.random() < 0.5:  # 50% chance.
+        # Move horizontally, then vertically.
+        corner_x, corner_y = x2, y1
+    else:
+        # Move vertically, then horizontally.
+        corner_x, corner_y = x1, y2
+
+    # Generate the coordinates for this tunnel.
+    for x, y in tcod.los.bresenham((x1, y1), (corner_x, corner_y)).tolist():
+        yield x, y
+    for x, y in tcod.los.bresenham((corner_x, corner_y), (x2, y2)).tolist():
+        yield x, y
+
+def pick_wall_tile(wall_tiles: np.ndarray) -> Optional[int]:
+    """
+    Picks the wall tile for a wall given which of its surrounding tiles are also walls.
+    :param wall_tiles: Flat indices of the tiles that are walls in the 3x3 block around the wall, in row-major (y, x)
+        order, so 4 is the wall itself.
+    :return: Tile from tile_types to represent the wall, or None if no rule matches, in which case autotile_walls leaves
+        the tile as it is (-1 in WALL_TILE_TABLE).
+    """
+    if len(wall_tiles) == 1:
+        return tile_types.pillar
+    elif len(wall_tiles) == 2:
+        if 1 in wall_tiles or 7 in wall_tiles:
+            return tile_types.vertical_wall
+        else:
+            return tile_types.horizontal_wall
+    elif len(wall_tiles) == 3:
+        if 1 in wall_tiles:
+            if 3 in wall_tiles:
+                return tile_types.left_up_wall
+            elif 5 in wall_tiles:
+                return tile_types.right_up_wall
+            else:
+                return tile_types.vertical_wall
+        elif 7 in wall_tiles:
+            if 3 in wall_tiles:
+                return tile_types.left_down_wall
+            elif 5 in wall_tiles:
+                return tile_types.right_down_wall
+            else:
+                return tile_types.horizontal_wall
+        else:
+            # Walls only to the sides or corners, no rule matches.
+            return None
+    elif len(wall_tiles) == 4 or len(wall_tiles) == 5:
+        if 1 in wall_tiles:
+            if 3 in wall_tiles and 5 in wall_tiles and 7 in wall_tiles:
+                return tile_types.cross
+            elif 3 in wall_tiles and 5 in wall_tiles:
+                return tile_types.t_up_wall
+            elif 3 in wall_tiles and 7 in wall_tiles:
+                return tile_types.t_left_wall
+            elif 5 in wall_tiles and 7 in wall_tiles:
+                return tile_types.t_right_wall
+            elif 3 in wall_tiles:
+                return tile_types.left_up_wall
+            elif 5 in wall_tiles:
+                return  tile_types.right_up_wall
+            else:
+                return tile_types.vertical_wall
+        elif 7 in wall_tiles:
+            if 3 in wall_tiles and 5 in wall_tiles:
+                return tile_types.t_down_wall
+            elif 3 in wall_tiles:
+                return tile_types.left_down_wall
+            elif 5 in wall_tiles:
+                return  tile_types.right_down_wall
+            else:
+                return tile_types.vertical_wall
+        else:
+            return  tile_types.horizontal_wall
+    elif len(wall_tiles) == 6:
+        if 1 in wall_tiles and 7 in wall_tiles:
+            if 3 in wall_tiles and 5 in wall_tiles:
+                return tile_types.cross
+            elif 3 in wall_tiles and 0 in wall_tiles and 6 in wall_tiles:
+                return tile_types.vertical_wall
+            elif 3 in wall_tiles and 2 in wall_tiles and 8 in wall_tiles:
+                return tile_types.t_left_wall
+            elif 3 in wall_tiles and 6 in wall_tiles and 0 not in wall_tiles:
+                return tile_types.left_up_wall
+            elif 3 in wall_tiles and 0 in wall_tiles and 6 not in wall_tiles:
+                return tile_types.left_down_wall
+            elif 5 in wall_tiles and 2 in wall_tiles and 8 in wall_tiles:
+                return tile_types.vertical_wall
+            elif 5 in wall_tiles and 0 in wall_tiles and 6 in wall_tiles:
+                return tile_types.t_right_wall
+            elif 5 in wall_tiles and 8 in wall_tiles and 2 not in wall_tiles:
+                return tile_types.right_up_wall
+            elif 5 in wall_tiles and 2 in wall_tiles and 8 not in wall_tiles:
+                return tile_types.right_down_wall
+            else:
+                return tile_types.horizontal_wall
+        elif 1 in wall_tiles and 3 in wall_tiles and 5 in wall_tiles:
+            if 6 in wall_tiles and 8 in wall_tiles:
+                return tile_types.t_up_wall
+            elif 2 in wall_tiles and 0 not in wall_tiles:
+                return tile_types.left_up_wall
+            elif 0 in wall_tiles and 2 not in wall_tiles:
+                return tile_types.right_up_wall
+            else:
+                return tile_types.horizontal_wall
+        elif 7 in wall_tiles and 3 in wall_tiles and 5 in wall_tiles:
+            if 0 in wall_tiles and 2 in wall_tiles:
+                return tile_types.t_down_wall
+            elif 2 in wall_tiles and 8 in wall_tiles or 0 in wall_tiles and 6 in wall_tiles:
+                return tile_types.t_down_wall
+            elif 8 in wall_tiles and 6 not in wall_tiles:
+                return tile_types.left_down_wall
+            elif 6 in wall_tiles and 8 not in wall_tiles:
+                return tile_types.right_down_wall
+            else:
+                return tile_types.horizontal_wall
+        elif 0 not in wall_tiles and 1 not in wall_tiles and 3 not in wall_tiles:
+            return tile_types.right_down_wall
+        elif 1 not in wall_tiles and 2 not in wall_tiles and 5 not in wall_tiles:
+            return tile_types.left_down_wall
+        elif 5 not in wall_tiles and 7 not in wall_tiles and 8 not in wall_tiles:
+            return tile_types.left_up_wall
+        elif 3 not in wall_tiles and 6 not in wall_tiles and 7 not in wall_tiles:
+            return tile_types.right_up_wall
+        else:
+            return tile_types.horizontal_wall
+    elif len(wall_tiles) == 7:
+        if 1 in wall_tiles and 3 in wall_tiles and 5 in wall_tiles and 7 in wall_tiles:
+            if 0 in wall_tiles and 8 in wall_tiles:
+                return tile_types.cross
+            elif 2 in wall_tiles and 6 in wall_tiles:
+                return tile_types.cross
+            elif 0 in wall_tiles and 2 in wall_tiles:
+                return tile_types.t_down_wall
+            elif 2 in wall_tiles and 8 in wall_tiles:
+                return tile_types.t_left_wall
+            elif 6 in wall_tiles and 8 in wall_tiles:
+                return tile_types.t_up_wall
+            elif 0 in wall_tiles and 6 in wall_tiles:
+                return tile_types.t_right_wall
+            else:
+                return tile_types.horizontal_wall
+        elif 1 in wall_tiles and 3 in wall_tiles and 5 in wall_tiles:
+            if 0 not in wall_tiles:
+                return tile_types.left_up_wall
+            elif 2 not in wall_tiles:
+                return tile_types.right_up_wall
+            else:
+                return tile_types.horizontal_wall
+        elif 3 in wall_tiles and 5 in wall_tiles and 7 in wall_tiles:
+            if 6 not in wall_tiles:
+                return tile_types.left_down_wall
+            elif 8 not in wall_tiles:
+                return tile_types.right_down_wall
+            else:
+                return  tile_types.horizontal_wall
+        elif 1 in wall_tiles and 3 in wall_tiles and 7 in wall_tiles:
+            if 0 not in wall_tiles:
+                return tile_types.left_up_wall
+            elif 6 not in wall_tiles:
+                return tile_types.left_down_wall
+            else:
+                return tile_types.vertical_wall
+        elif 1 in wall_tiles and 5 in wall_tiles and 7 in wall_tiles:
+            if 2 not in wall_tiles:
+                return tile_types.right_up_wall
+            elif 8 not in wall_tiles:
+                return tile_types.right_down_wall
+            else:
+                return tile_types.vertical_wall
+        else:
+            return tile_types.horizontal_wall
+    elif len(wall_tiles) == 8:
+        if 3 not in wall_tiles or 5 not in wall_tiles:
+            return tile_types.vertical_wall
+        elif 0 not in wall_tiles:
+            return tile_types.left_up_wall
+        elif 2 not in wall_tiles:
+            return tile_types.right_up_wall
+        elif 6 not in wall_tiles:
+            return tile_types.left_down_wall
+        elif 8 not in wall_tiles:
+            return tile_types.right_down_wall
+        else:
+            return tile_types.horizontal_wall
+    else:
+        return tile_types.horizontal_wall
+
+# Offsets of the 8 neighbours of a tile, in the order of their bits in a wall mask. In the same order they are the flat
+# indices 0-3 and 5-8 used by pick_wall_tile, where 4 is the tile itself.
+NEIGHBOUR_OFFSETS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+
+def _build_wall_tile_table() -> np.ndarray:
+    """
+    Runs pick_wall_tile for every possible set of wall neighbours.
+    :return: 256 entry array mapping a wall mask to a tile ID, or -1 where the tile should be left as it is.
+    """
+    table = np.full(256, -1, dtype=np.int16)
+
+    for mask in range(256):
+        wall_tiles = [4]  # The tile itself is always a wall.
+        for bit, (dx, dy) in enumerate(NEIGHBOUR_OFFSETS):
+            if mask & (1 << bit):
+                wall_tiles.append((dy + 1) * 3 + (dx + 1))
+
+        tile = pick_wall_tile(np.array(sorted(wall_tiles)))
+        if tile is not None:
+            table[mask] = tile
+
+    return table
+
+
+WALL_TILE_TABLE = _build_wall_tile_table()
+
+
+def wall_masks(dungeon: DungeonLevel) -> np.ndarray:
+    """
+    Computes an 8 bit mask for every tile with a bit set for each neighbour that is not floor, in NEIGHBOUR_OFFSETS order.
+    Tiles outside the map count as walls.
+    """
+    walls = np.pad(dungeon.tiles != tile_types.floor, 1, constant_values=True)
+    masks = np.zeros((dungeon.width, dungeon.height), dtype=np.uint8, order="F")
+
+    for bit, (dx, dy) in enumerate(NEIGHBOUR_OFFSETS):
+        neighbours = walls[1 + dx : 1 + dx + dungeon.width, 1 + dy : 1 + dy + dungeon.height]
+        masks |= neighbours.astype(np.uint8) << np.uint8(bit)
+
+    return masks
+
+def autotile_walls(dungeon: DungeonLevel) -> None:
+    """
+    Replaces every tile that isn't a floor or a pillar with the wall tile picked by pick_wall_tile, by looking up each
+    tile's wall mask in WALL_TILE_TABLE instead of looping over the map in Python.
+    """
+    is_wall = (dungeon.tiles != tile_types.floor) & (dungeon.tiles != tile_types.pillar)
+    choices = WALL_TILE_TABLE[wall_masks(dungeon)]
+    to_change = is_wall & (choices >= 0)
+    dungeon.tiles[to_change] = choices[to_change]
+
+def generate_dungeon(
+    max_rooms: int,
+    room_min_size: int,
+    room_max_size: int,
+    map_width: int,
+    map_height: int,
+    max_enemies_per_room: int,
+    engine: Engine,
+    rng: Optional[random.Random] = None,
+) -> GameMap:
+    """Generate a new dungeon map."""
+    level = generate_level(
+        max_rooms=max_rooms,
+        room_min_size=room_min_size,
+        room_max_size=room_max_size,
+        map_width=map_width,
+        map_height=map_height,
+        max_enemies_per_room=max_enemies_per_room,
+        rng=rng or random.Random(),
+    )
+    return build_dungeon(level, engine)
+
+def build_dungeon(level: DungeonLevel, engine: Engine) -> GameMap:
+    """Turn a generated level into a GameMap, placing the player and spawning its entities."""
+    player = engine.player
+    dungeon = GameMap(engine, level.width, level.height, entities=[player])
+    dungeon.tiles[:] = level.tiles
+
+    player.place(*level.player_start, dungeon)
+
+    for name, x, y in level.spawns:
+        getattr(entity_factories, name).spawn(dungeon, x, y)
+
+    return dungeon
+
+def generate_level(
+    max_rooms: int,
+    room_min_size: int,
+    room_max_size: int,
+    map_width: int,
+    map_height: int,
+    max_enemies_per_room: int,
+    rng: random.Random,
+) -> DungeonLevel:
+    """Generate a new dungeon level. The same settings and rng state always give the same level."""
+    dungeon = DungeonLevel(map_width, map_height)
+
+    rooms: List[RectangularRoom] = []
+
+    for r in range(max_rooms):
+        room_width = rng.randint(room_min_size, room_max_size)
+        room_height = rng.randint(room_min_size, room_max_size)
+
+        x = rng.randint(0, dungeon.width - room_width - 1)
+        y = rng.randint(0, dungeon.height - room_height - 1)
+
+        # "RectangularRoom" class makes rectangles easier to work with
+        new_room = RectangularRoom(x, y, room_width, room_height)
+
+        # Run through the other rooms and see if they intersect with this one.
+        if any(new_room.intersects(other_room) for other_room in rooms):
+            continue  # This room intersects, so go to the next attempt.
+        # If there are no intersections then the room is valid.
+
+        # Dig out this rooms inner area.
+        dungeon.tiles[new_room.inner] = tile_types.floor
+
+        if len(rooms) == 0:
+            # The first room, where the player starts.
+            dungeon.player_start = new_room.center
+        else:  # All rooms after the first.
+            # Dig out a tunnel between this room and the previous one.
+            for x, y in tunnel_between(rooms[-1].center, new_room.center, rng):
+                dungeon.tiles[x, y] = tile_types.floor
+
+        # Finally, append the new room to the list.
+        rooms.append(new_room)
+
+    # Create pillars based on room size and place entities.
+    for room in rooms:
+        x, y = room.center
+        if room.width >= int(room_max_size * 0.5) and room.height >= int(room_max_size * 0.5):
+            dungeon.tiles[x - int(room.width / 4), y - int(room.height / 4)] = tile_types.pillar
+            dungeon.tiles[x + int(room.width / 4), y - int(room.height / 4)] = tile_types.pillar
+            dungeon.tiles[x - int(room.width / 4), y + int(room.height / 4)] = tile_types.pillar
+            dungeon.tiles[x + int(room.width / 4), y + int(room.height / 4)] = tile_types.pillar
+        elif room.width >= int(room_max_size * 0.5) and room.height < int(room_max_size * 0.5):
+            dungeon.tiles[x - int(room.width / 3) + 1, y] = tile_types.pillar
+            dungeon.tiles[x + int(room.width / 3) - 1, y] = tile_types.pillar
+        elif room.width < int(room_max_size * 0.5) and room.height >= int(room_max_size * 0.5):
+            if rng.random() > 0.5:
+                dungeon.tiles[x, y - int(room.height / 3) + 1] = tile_types.pillar
+                dungeon.tiles[x, y + int(room.height / 3) - 1] = tile_types.pillar
+
+        place_entities(room, dungeon, max_enemies_per_room, rng)
+
+    # Change every wall tile to the wall type that matches its neighbours.
+    autotile_walls(dungeon)
+
+    # Insert doors where single tile tunnels pass through the walls of rooms.
+    for room in rooms:
+        for x in range(1, room.width):
+            if (
+                dungeon.tiles[room.x1 + x, room.y1] == tile_types.floor and
+                dungeon.tiles[room.x1 + x + 1, room.y1] != tile_types.floor and
+                dungeon.tiles[room.x1 + x - 1, room.y1] != tile_types.floor
+            ):
+                dungeon.tiles[room.x1 + x, room.y1] = tile_types.door
+            if (
+                dungeon.tiles[room.x1 + x, room.y2] == tile_types.floor and
+                dungeon.tiles[room.x1 + x + 1, room.y2] != tile_types.floor and
+                dungeon.tiles[room.x1 + x - 1, room.y2] != tile_types.floor
+            ):
+                dungeon.tiles[room.x1 + x, room.y2] = tile_types.door
+        for y in range(1, room.height):
+            if (
+                dungeon.tiles[room.x1, room.y1 + y] == tile_types.floor and
+                dungeon.tiles[room.x1, room.y1 + y + 1] != tile_types.floor and
+                dungeon.tiles[room.x1, room.y1 + y - 1] != tile_types.floor
+            ):
+                dungeon.tiles[room.x1, room.y1 + y] = tile_types.door
+            if (
+                dungeon.tiles[room.x2, room.y1 + y] == tile_types.floor and
+                dungeon.tiles[room.x2, room.y1 + y + 1] != tile_types.floor and
+                dungeon.tiles[room.x2, room.y1 + y - 1] != tile_types.floor
+            ):
+                dungeon.tiles[room.x2, room.y1 + y] = tile_types.door
+
+    return dungeon
\ No newline at end of file
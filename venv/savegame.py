@@ -0,0 +1,248 @@
+"""
+Saving and loading of the game state.
+
+A save is a directory. The map arrays are stored as raw .npy files so that loading memory-maps them instead of reading
+and copying them. The entities are stored as a table with one row per attribute in entities.npy, mostly copied straight from the
+map's EntityStore, rather than as pickled objects.
+"""
+from __future__ import annotations
+
+import contextlib
+import gc
+import json
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np  # type: ignore
+
+import components.ai
+from components.fighter import Fighter
+from engine import Engine
+from entity import Actor, Entity
+from entity_store import EntityStore
+from game_map import GameMap
+from render_order import RenderOrder
+
+SAVE_FORMAT_VERSION = 1
+
+MAP_ARRAYS = ("tiles", "visible", "explored")
+
+# Columns of an EntityStore that are saved. The rest of an entity is stored in the extra columns and meta.json.
+STORE_COLUMNS = tuple(name for name in EntityStore.COLUMNS if name != "in_use")
+
+# Rows of entities.npy, each one holding an attribute for every entity. Names and AI types are stored in meta.json.
+ENTITY_COLUMNS = STORE_COLUMNS + ("char", "red", "green", "blue", "render_order", "ai")
+
+
+class Snapshot:
+    """A copy of the game state taken between turns, which can be written out while the game carries on."""
+    def __init__(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.arrays = arrays
+
+
+def take_snapshot(engine: Engine) -> Snapshot:
+    """Copy everything needed to restore the engine into arrays."""
+    game_map = engine.game_map
+    store = game_map.store
+    rows = store.rows()
+    entities: List[Entity] = [store.entities[row] for row in rows.tolist()]  # type: ignore
+
+    table = np.empty((len(ENTITY_COLUMNS), len(entities)), dtype=np.int32)
+    for i, name in enumerate(STORE_COLUMNS):
+        table[i] = getattr(store, name)[rows]
+
+    # An AI of -1 means no AI, a dead actor.
+    ai_types: List[str] = []
+    ai_indexes: List[int] = []
+    for entity in entities:
+        ai = getattr(entity, "ai", None)
+        if ai is None:
+            ai_indexes.append(-1)
+            continue
+        ai_name = type(ai).__name__
+        if ai_name not in ai_types:
+            ai_types.append(ai_name)
+        ai_indexes.append(ai_types.index(ai_name))
+
+    extra = table[len(STORE_COLUMNS):]
+    extra[0] = [ord(entity.char) for entity in entities]
+    extra[1:4] = np.array([entity.color for entity in entities], dtype=np.int32).reshape(-1, 3).T
+    extra[4] = [entity.render_order.value for entity in entities]
+    extra[5] = ai_indexes
+
+    meta = {
+        "version": SAVE_FORMAT_VERSION,
+        "width": game_map.width,
+        "height": game_map.height,
+        "player": entities.index(engine.player),
+        "entity_columns": ENTITY_COLUMNS,
+        "names": [entity.name for entity in entities],
+        "ai_types": ai_types,
+    }
+    arrays = {name: np.array(getattr(game_map, name), order="F") for name in MAP_ARRAYS}
+    arrays["entities"] = table
+    return Snapshot(meta, arrays)
+
+
+def write_snapshot(snapshot: Snapshot, directory: str) -> None:
+    """
+    Write a snapshot to a save directory, replacing any save already there.
+
+    The new save is written next to the old one and swapped in when complete, so a crash never leaves half a save.
+    """
+    temp_directory = directory + ".tmp"
+    old_directory = directory + ".old"
+    shutil.rmtree(temp_directory, ignore_errors=True)
+    os.makedirs(temp_directory)
+
+    for name, array in snapshot.arrays.items():
+        np.save(os.path.join(temp_directory, f"{name}.npy"), array)
+    with open(os.path.join(temp_directory, "meta.json"), "w") as f:
+        json.dump(snapshot.meta, f)
+
+    shutil.rmtree(old_directory, ignore_errors=True)
+    if os.path.exists(directory):
+        os.replace(directory, old_directory)
+    os.replace(temp_directory, directory)
+    shutil.rmtree(old_directory, ignore_errors=True)
+
+
+def release_save_files(game_map: GameMap, directory: str) -> None:
+    """
+    Replace any of the map's arrays that are memory-mapped from a save in `directory` with in-memory copies.
+
+    Must be called before writing a save over the one a game was loaded from, since the old save's files are deleted
+    and a file that is still mapped can't be deleted on Windows.
+    """
+    directory = os.path.abspath(directory)
+    for name in MAP_ARRAYS:
+        array = getattr(game_map, name)
+        if isinstance(array, np.memmap) and os.path.dirname(os.path.abspath(array.filename)) == directory:
+            setattr(game_map, name, np.array(array, order="F"))
+
+
+def save_game(engine: Engine, directory: str) -> None:
+    release_save_files(engine.game_map, directory)
+    write_snapshot(take_snapshot(engine), directory)
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector.
+
+    Used while a load creates thousands of objects, which would otherwise set off collections that scan them over and
+    over although none of them is garbage.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def load_game(directory: str) -> Engine:
+    """
+    Load a save made by save_game and return a new Engine for it.
+
+    The map arrays are memory-mapped copy-on-write, so they are only read from disk as they are used and changes made
+    while playing don't touch the save. Saving back to the same directory first copies them into memory, see
+    release_save_files. AI state other than the AI's type, such as a remembered path, isn't saved.
+    """
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    if meta["version"] != SAVE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported save format version {meta['version']}.")
+
+    table = np.load(os.path.join(directory, "entities.npy"))
+    columns = dict(zip(meta["entity_columns"], table))
+    ai_classes = [getattr(components.ai, name) for name in meta["ai_types"]]
+
+    # The objects are created empty and filled in from the columns, so nothing is done per entity that can be done
+    # for all of them at once.
+    with _gc_paused():
+        entities: List[Entity] = [
+            object.__new__(Actor if is_actor else Entity) for is_actor in columns["is_actor"].tolist()
+        ]
+
+        engine = Engine(player=entities[meta["player"]])
+        game_map = GameMap(engine, meta["width"], meta["height"])
+        for name in MAP_ARRAYS:
+            setattr(game_map, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="c"))
+
+        store = game_map.store
+        rows = store.allocate_many(entities)
+        for name in STORE_COLUMNS:
+            getattr(store, name)[rows] = columns[name]
+
+        colors = np.stack([columns["red"], columns["green"], columns["blue"]], axis=1).tolist()
+        render_orders = {order.value: order for order in RenderOrder}
+        for entity, row, char, color, render_order, name, ai_index in zip(
+            entities,
+            range(rows.start, rows.stop),
+            columns["char"].tolist(),
+            colors,
+            columns["render_order"].tolist(),
+            meta["names"],
+            columns["ai"].tolist(),
+        ):
+            entity._store = store
+            entity._row = row
+            entity._char = chr(char)
+            entity._color = tuple(color)  # type: ignore
+            entity.name = name
+            entity._render_order = render_orders[render_order]
+            entity.gamemap = game_map
+            if isinstance(entity, Actor):
+                # An AI of -1 means no AI, a dead actor.
+                entity._ai = ai_classes[ai_index](entity) if ai_index >= 0 else None
+                entity.fighter = Fighter.for_row(entity)
+
+        game_map.add_entities(entities)
+
+    engine.game_map = game_map
+    return engine
+
+
+class Autosaver:
+    """
+    Saves the game every `every_n_turns` turns.
+
+    The snapshot is taken on the calling thread between turns, which only copies arrays, and written to disk on a
+    background thread so the game doesn't stall.
+    """
+    def __init__(self, directory: str, every_n_turns: int = 50):
+        self.directory = directory
+        self.every_n_turns = every_n_turns
+        self.turns = 0
+        self._last_save_turn = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending: Optional[Future[None]] = None
+
+    def on_turn(self, engine: Engine) -> None:
+        """Count a turn and start a save if one is due."""
+        self.turns += 1
+        if self.turns - self._last_save_turn < self.every_n_turns:
+            return
+
+        if self._pending is not None and not self._pending.done():
+            return  # The last save is still being written, try again next turn.
+
+        release_save_files(engine.game_map, self.directory)
+        snapshot = take_snapshot(engine)
+        self._pending = self._executor.submit(write_snapshot, snapshot, self.directory)
+        self._last_save_turn = self.turns
+
+    def wait(self) -> None:
+        """Block until the last save has been written."""
+        if self._pending is not None:
+            self._pending.result()
+
+    def close(self) -> None:
+        self.wait()
+        self._executor.shutdown()
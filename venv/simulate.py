@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Run the game without a window.
+
+The player is driven by a seeded stream of random BumpActions and WaitActions and the map is rendered to an off-screen
+console, so the whole turn loop can be measured under load. Prints the results as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+from typing import Dict, Iterator, List, Optional
+
+import tcod
+
+from actions import Action, BumpAction, WaitAction
+from engine import Engine
+import entity_factories
+from procgen import generate_dungeon
+from savegame import Autosaver
+
+
+class PhaseTimer:
+    """Adds up the time spent in each named phase of a turn."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+
+def new_game(
+    seed: int,
+    map_width: int = 100,
+    map_height: int = 65,
+    max_rooms: int = 40,
+    room_min_size: int = 7,
+    room_max_size: int = 25,
+    max_enemies_per_room: int = 3,
+    timer: Optional[PhaseTimer] = None,
+) -> Engine:
+    """Set up an Engine the same way main() does, with a seeded dungeon."""
+    timer = timer or PhaseTimer()
+
+    player = entity_factories.player.clone()
+    engine = Engine(player=player)
+
+    with timer.phase("generate_dungeon"):
+        engine.game_map = generate_dungeon(
+            max_rooms=max_rooms,
+            room_min_size=room_min_size,
+            room_max_size=room_max_size,
+            map_width=map_width,
+            map_height=map_height,
+            max_enemies_per_room=max_enemies_per_room,
+            engine=engine,
+            rng=random.Random(seed),
+        )
+
+    engine.update_fov()
+    return engine
+
+
+def random_actions(engine: Engine, rng: random.Random, wait_chance: float = 0.2) -> Iterator[Action]:
+    """Yield an endless stream of random player actions."""
+    while True:
+        if rng.random() < wait_chance:
+            yield WaitAction(engine.player)
+        else:
+            yield BumpAction(engine.player, rng.randint(-1, 1), rng.randint(-1, 1))
+
+
+def run_turns(
+    engine: Engine,
+    actions: Iterator[Action],
+    turns: int,
+    console: Optional[tcod.Console] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> PhaseTimer:
+    """
+    Play `turns` turns the way EventHandler.handle_events does, taking the player's actions from `actions`. If a
+    console is given then each turn is rendered to it.
+    """
+    timer = timer or PhaseTimer()
+
+    for _, action in zip(range(turns), actions):
+        with timer.phase("player_action"):
+            action.perform()
+        with timer.phase("handle_enemy_turns"):
+            engine.handle_enemy_turns()
+        with timer.phase("update_fov"):
+            engine.update_fov()
+        if engine.autosaver:
+            with timer.phase("autosave"):
+                engine.autosaver.on_turn(engine)
+        if console is not None:
+            with timer.phase("render"):
+                engine.render(console)
+
+    return timer
+
+
+def simulate(
+    seed: int = 0,
+    turns: int = 1000,
+    map_width: int = 100,
+    map_height: int = 65,
+    max_rooms: int = 40,
+    max_enemies_per_room: int = 3,
+    render: bool = True,
+    autosave_directory: Optional[str] = None,
+    autosave_every_n_turns: int = 50,
+) -> Dict[str, object]:
+    """
+    Generate a dungeon, play random turns in it and return timings for each phase. If `autosave_directory` is given
+    then the game is autosaved there every `autosave_every_n_turns` turns.
+    """
+    timer = PhaseTimer()
+    engine = new_game(
+        seed,
+        map_width=map_width,
+        map_height=map_height,
+        max_rooms=max_rooms,
+        max_enemies_per_room=max_enemies_per_room,
+        timer=timer,
+    )
+    enemies = len(set(engine.game_map.actors) - {engine.player})
+    console = tcod.Console(map_width, map_height, order="F") if render else None
+    if autosave_directory:
+        engine.autosaver = Autosaver(autosave_directory, every_n_turns=autosave_every_n_turns)
+
+    # Combat messages are printed, keep them out of the results.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        run_turns(engine, random_actions(engine, random.Random(seed)), turns, console, timer)
+        elapsed = time.perf_counter() - start
+
+    if engine.autosaver:
+        # Not timed, only the stall on the game thread is part of a turn.
+        engine.autosaver.close()
+
+    return {
+        "seed": seed,
+        "map_width": map_width,
+        "map_height": map_height,
+        "max_enemies_per_room": max_enemies_per_room,
+        "enemies": enemies,
+        "turns": turns,
+        "turns_per_second": turns / elapsed if elapsed else 0.0,
+        "phase_seconds": timer.seconds,
+        "fov_cache_hit_rate": engine.fov_stats.hit_rate,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--height", type=int, default=65)
+    parser.add_argument("--max-rooms", type=int, default=40)
+    parser.add_argument("--max-enemies-per-room", type=int, default=3)
+    parser.add_argument("--no-render", action="store_true")
+    parser.add_argument("--autosave", metavar="DIRECTORY", help="Autosave the game to this directory.")
+    parser.add_argument("--autosave-every", type=int, default=50, metavar="TURNS")
+    args = parser.parse_args(argv)
+
+    result = simulate(
+        seed=args.seed,
+        turns=args.turns,
+        map_width=args.width,
+        map_height=args.height,
+        max_rooms=args.max_rooms,
+        max_enemies_per_room=args.max_enemies_per_room,
+        render=not args.no_render,
+        autosave_directory=args.autosave,
+        autosave_every_n_turns=args.autosave_every,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()